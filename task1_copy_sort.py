@@ -3,7 +3,7 @@
 Asynchronous recursive file copier & sorter by file extension.
 
 Usage:
-    python task1_copy_sort.py /path/to/source [/path/to/dest]
+    python task1_copy_sort.py /path/to/source [/path/to/dest] [--link-dupes]
 
 If *dest* is not provided, the default `./dist` folder is created in the current working directory.
 
@@ -11,22 +11,50 @@ Features:
     * Files are copied from the source directory into the destination directory, organized by file extension.
     * Files without an extension are copied into the ``no_extension`` subdirectory.
     * If a file with the same name exists in the target subdirectory:
-        - If the content is identical (SHA-256 hash matches), the copy is skipped as a duplicate.
+        - If the content is identical (BLAKE2b digest matches), the copy is skipped as a duplicate.
         - If the content differs, the file is copied with a hash suffix added to its name (e.g., `file_abcd1234.txt`).
-    * Uses asynchronous I/O (asyncio, aiofiles) for efficient processing of many files.
+    * Copies are reflinked (copy-on-write clone) where the filesystem supports it (Linux FICLONE).
+    * With ``--link-dupes``, files whose content was already copied under another name are
+      materialised as hard links instead of new copies.
+    * Uses asynchronous I/O (asyncio, aiofiles or, if installed, libuv-backed asyncfiles) for efficient
+      processing of many files.
     * Logs all operations: copied files, skipped identical duplicates, renamed copies for different files, and any errors.
 """
 
 import argparse
 import asyncio
+import contextlib
 import hashlib
 import logging
+import os
+import shutil
+import sys
+import uuid
 from pathlib import Path
+from typing import (
+    Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union,
+)
 import aiofiles
 import aiofiles.os
 
-CHUNK_SIZE: int = 65536  # 64 KB
+try:
+    import fcntl  # reflink ioctl (POSIX only)
+except ImportError:
+    fcntl = None
+
+# Optional libuv-backed file I/O; falls back to aiofiles' thread-pool wrappers
+try:
+    from asyncfiles import open as aopen
+except ImportError:
+    aopen = aiofiles.open
+
+CHUNK_SIZE: int = 1 << 20  # 1 MB
 MAX_CONCURRENT: int = 100
+SAMPLE_SIZE: int = 4096  # 4 KB head/tail sample for quick mismatch detection
+FICLONE: int = getattr(fcntl, "FICLONE", 0x40049409)  # Linux ioctl, exposed by fcntl in 3.12+
+
+# Digest memo keyed by (path, st_mtime_ns, st_size) so unchanged files are hashed once
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
 
 def parse_args() -> argparse.Namespace:
     """Parse command-line parameters."""
@@ -45,66 +73,305 @@ def parse_args() -> argparse.Namespace:
         default=Path("dist"),
         help="Path to the destination directory (default: ./dist)",
     )
+    parser.add_argument(
+        "--link-dupes",
+        action="store_true",
+        help="Hard-link files whose content was already copied under another name",
+    )
     return parser.parse_args()
 
+def _file_digest(file_path: Path) -> str:
+    """Blocking BLAKE2b digest of a file via ``hashlib.file_digest``."""
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
 async def compute_hash(file_path: Path) -> str:
-    """Compute SHA-256 hash of the given file asynchronously."""
-    hash_obj = hashlib.sha256()
-    async with aiofiles.open(file_path, "rb") as f:
+    """Compute BLAKE2b digest of the given file asynchronously (memoized by path, mtime and size)."""
+    st = await aiofiles.os.stat(file_path)
+    key = (str(file_path), st.st_mtime_ns, st.st_size)
+    cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+    if hasattr(hashlib, "file_digest"):
+        # Python 3.11+: C read+hash loop in a worker thread, GIL released while hashing
+        digest = await asyncio.get_running_loop().run_in_executor(None, _file_digest, file_path)
+    else:
+        hash_obj = hashlib.blake2b(digest_size=16)
+        async with aopen(file_path, "rb") as f:
+            while True:
+                chunk = await f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hash_obj.update(chunk)
+        digest = hash_obj.hexdigest()
+    _hash_cache[key] = digest
+    return digest
+
+async def _sample_digest(file_path: Path, size: int) -> str:
+    """Cheap digest of the first and last ``SAMPLE_SIZE`` bytes of a file."""
+    hash_obj = hashlib.blake2b(digest_size=8)
+    async with aopen(file_path, "rb") as f:
+        hash_obj.update(await f.read(SAMPLE_SIZE))
+        if size > 2 * SAMPLE_SIZE:
+            await f.seek(size - SAMPLE_SIZE)
+            hash_obj.update(await f.read(SAMPLE_SIZE))
+    return hash_obj.hexdigest()
+
+async def _copy_and_hash(src_path: Path, dest_path: Path) -> str:
+    """Stream *src_path* into *dest_path* and return the BLAKE2b digest of the copied bytes."""
+    hash_obj = hashlib.blake2b(digest_size=16)
+    async with aopen(src_path, "rb") as src_f, aopen(dest_path, "wb") as dst_f:
         while True:
-            chunk = await f.read(CHUNK_SIZE)
-            if not chunk:
+            data = await src_f.read(CHUNK_SIZE)
+            if not data:
                 break
-            hash_obj.update(chunk)
+            hash_obj.update(data)
+            await dst_f.write(data)
     return hash_obj.hexdigest()
 
-async def copy_file_task(src_path: Path, dst_root: Path, sem: asyncio.Semaphore) -> None:
-    """Asynchronously copy a single file to the destination folder (by extension)."""
-    async with sem:
-        try:
-            ext_folder: str = src_path.suffix.lower().lstrip(".") or "no_extension"
-            dest_dir: Path = dst_root / ext_folder
-            # Ensure destination subdirectory exists
-            await aiofiles.os.makedirs(dest_dir, exist_ok=True)
-            dest_file: Path = dest_dir / src_path.name
-            if dest_file.exists():
-                src_size = src_path.stat().st_size
-                dst_size = dest_file.stat().st_size
-                if src_size == dst_size:
-                    src_hash = await compute_hash(src_path)
-                    dst_hash = await compute_hash(dest_file)
-                    if src_hash == dst_hash:
-                        logging.info(f"Skipped duplicate (identical content): {src_path}")
-                        return
-                    else:
-                        short_hash = src_hash[:8]
-                        new_name = f"{src_path.stem}_{short_hash}{src_path.suffix}"
-                        dest_file = dest_dir / new_name
-                        logging.info(
-                            f"Duplicate with different content, copying with new name: "
-                            f"{src_path} -> {dest_file.name}"
-                        )
-                else:
-                    src_hash = await compute_hash(src_path)
-                    short_hash = src_hash[:8]
-                    new_name = f"{src_path.stem}_{short_hash}{src_path.suffix}"
-                    dest_file = dest_dir / new_name
-                    logging.info(
-                        f"Duplicate with different content (different size), copying with new name: "
-                        f"{src_path} -> {dest_file.name}"
-                    )
+def _clone_or_copy(src_path: Path, dest_file: Path) -> None:
+    """Reflink *src_path* to *dest_file* where supported, otherwise copy in-kernel."""
+    if fcntl is not None and sys.platform.startswith("linux"):
+        with open(src_path, "rb") as src_f, open(dest_file, "wb") as dst_f:
+            try:
+                fcntl.ioctl(dst_f.fileno(), FICLONE, src_f.fileno())
+                return
+            except OSError:
+                pass  # no CoW support here (EXDEV, EOPNOTSUPP, EINVAL, ...)
+    shutil.copyfile(src_path, dest_file)
+
+async def _copyfile(src_path: Path, dest_file: Path) -> None:
+    """Copy without a digest: reflink or kernel copy (copy_file_range/sendfile) off the event loop."""
+    await asyncio.get_running_loop().run_in_executor(None, _clone_or_copy, src_path, dest_file)
+
+async def link_file_task(
+    src_path: Path,
+    existing: Path,
+    dest_file: Path,
+    src_hash: str,
+) -> None:
+    """Materialise *src_path* as a hard link to *existing*, a copy with the same content."""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, os.link, existing, dest_file)
+        logging.info(f"Linked duplicate content: {src_path} -> {dest_file} (= {existing.name})")
+        return
+    except OSError:
+        pass  # name taken, cross-device or no hard-link support
+    # Fall back to the regular copy with collision handling
+    await copy_file_task(src_path, dest_file, src_hash)
+
+async def copy_file_task(
+    src_path: Path,
+    dest_file: Path,
+    src_hash: Optional[str] = None,
+) -> Optional[Path]:
+    """Copy a file to its planned path (reflink/kernel copy); on a name clash skip or rename it.
+
+    Returns the path that now holds the source content, or ``None`` on error.
+    """
+    part_file: Optional[Path] = None
+    try:
+        dest_dir: Path = dest_file.parent  # pre-created by main_async
+        st = await aiofiles.os.stat(src_path)
+        if not await aiofiles.os.path.exists(dest_file):
+            if dest_file.name != src_path.name:
+                # Renamed during planning
+                logging.info(
+                    f"Duplicate with different content, copying with new name: "
+                    f"{src_path} -> {dest_file.name}"
+                )
             else:
                 logging.info(f"Copying file: {src_path} -> {dest_file}")
-            async with aiofiles.open(src_path, "rb") as src_f, aiofiles.open(dest_file, "wb") as dst_f:
-                while True:
-                    data = await src_f.read(CHUNK_SIZE)
-                    if not data:
-                        break
-                    await dst_f.write(data)
+            await _copyfile(src_path, dest_file)
+            return dest_file
+        maybe_identical = False
+        dst_size = (await aiofiles.os.stat(dest_file)).st_size
+        if st.st_size == dst_size:
+            # Rule out equality with a head+tail sample before reading both files fully
+            maybe_identical = (
+                await _sample_digest(src_path, st.st_size)
+                == await _sample_digest(dest_file, dst_size)
+            )
+        if src_hash is None:
+            if maybe_identical:
+                # Probably a duplicate: hash in place rather than writing a copy to discard
+                src_hash = await compute_hash(src_path)
+            else:
+                # Certainly a copy: hash while streaming it so the source is read once
+                part_file = dest_dir / f".{src_path.name}.{uuid.uuid4().hex[:8]}.part"
+                src_hash = await _copy_and_hash(src_path, part_file)
+                _hash_cache[(str(src_path), st.st_mtime_ns, st.st_size)] = src_hash
+        if maybe_identical and src_hash == await compute_hash(dest_file):
+            if part_file is not None:
+                await aiofiles.os.remove(part_file)
+            logging.info(f"Skipped duplicate (identical content): {src_path}")
+            return dest_file
+        new_name = f"{src_path.stem}_{src_hash[:8]}{src_path.suffix}"
+        dest_file = dest_dir / new_name
+        logging.info(
+            f"Duplicate with different content, copying with new name: "
+            f"{src_path} -> {dest_file.name}"
+        )
+        if part_file is not None:
+            await aiofiles.os.replace(part_file, dest_file)
+        else:
+            await _copyfile(src_path, dest_file)
+        return dest_file
+    except (PermissionError, OSError) as exc:
+        logging.error(f"Error processing {src_path}: {exc}")
+        if part_file is not None:
+            with contextlib.suppress(OSError):
+                part_file.unlink()
+        return None
+
+async def _existing_digest(
+    dest_file: Path, candidates: List[Path]
+) -> Tuple[Optional[str], List[Path]]:
+    """Digest of *dest_file* if a candidate may share its content, and the readable candidates."""
+    try:
+        dst_size = (await aiofiles.os.stat(dest_file)).st_size
+    except OSError as exc:
+        logging.error(f"Error reading {dest_file}: {exc}")
+        return None, candidates  # unknown content: candidates just get suffixed names
+    dst_sample: Optional[str] = None
+    readable: List[Path] = []
+    for i, f in enumerate(candidates):
+        try:
+            size = (await aiofiles.os.stat(f)).st_size
+            src_sample = await _sample_digest(f, size) if size == dst_size else None
+        except OSError as exc:
+            logging.error(f"Error processing {f}: {exc}")
+            continue
+        readable.append(f)
+        if src_sample is None:
+            continue
+        try:
+            if dst_sample is None:
+                dst_sample = await _sample_digest(dest_file, dst_size)
+            if src_sample == dst_sample:
+                return await compute_hash(dest_file), readable + candidates[i + 1:]
+        except OSError as exc:
+            logging.error(f"Error reading {dest_file}: {exc}")
+            return None, readable + candidates[i + 1:]
+    return None, readable
+
+async def _run_workers(jobs: Iterable[Tuple[Any, ...]], handle: Callable[..., Awaitable[None]]) -> None:
+    """Feed *jobs* through a bounded queue to ``MAX_CONCURRENT`` worker coroutines.
+
+    Only the workers and a few queued jobs are alive at once, instead of one task per job.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_CONCURRENT * 4)
+
+    async def worker() -> None:
+        while True:
+            job = await queue.get()
+            try:
+                await handle(*job)
+            except Exception as exc:  # keep the worker alive so the queue keeps draining
+                logging.error(f"Error processing {job[0]}: {exc}")
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(MAX_CONCURRENT)]
+    for job in jobs:
+        await queue.put(job)
+    await queue.join()
+    for w in workers:
+        w.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+async def _plan_copies(
+    files: List[Path],
+    dst_root: Path,
+    link_dupes: bool = False,
+) -> Tuple[List[Tuple[Path, Path, Optional[str]]], List[Tuple[Path, Path, Path, str]]]:
+    """Plan ``(src, dest, digest)`` copies and ``(src, original_src, dest, digest)`` hard links.
+
+    Same-named sources are hashed once and deduplicated by content; with *link_dupes* all are.
+    """
+    groups: Dict[Path, List[Path]] = {}
+    for f in files:
+        ext_folder = f.suffix.lower().lstrip(".") or "no_extension"
+        groups.setdefault(dst_root / ext_folder / f.name, []).append(f)
+    clashing = [
+        f for members in groups.values() if link_dupes or len(members) > 1 for f in members
+    ]
+
+    digests: Dict[Path, Union[str, Exception]] = {}
+
+    async def hash_one(file_path: Path) -> None:
+        try:
+            digests[file_path] = await compute_hash(file_path)
         except (PermissionError, OSError) as exc:
-            logging.error(f"Error processing {src_path}: {exc}")
+            digests[file_path] = exc
+
+    await _run_workers(((f,) for f in clashing), hash_one)
+
+    plan: List[Tuple[Path, Path, Optional[str]]] = []
+    links: List[Tuple[Path, Path, Path, str]] = []
+    placed: Dict[str, Path] = {}  # digest -> source chosen to be copied
 
-async def main_async(src: Path, dst: Path) -> None:
+    async def resolve_group(dest_file: Path, members: List[Path]) -> None:
+        by_digest: Dict[str, Path] = {}
+        candidates: List[Path] = []
+        for f in members:
+            digest = digests[f]
+            if isinstance(digest, Exception):
+                logging.error(f"Error processing {f}: {digest}")
+            else:
+                candidates.append(f)
+        # Content already at dest_file counts as copied, so re-runs skip it
+        name_taken = await aiofiles.os.path.exists(dest_file)
+        if name_taken:
+            on_disk, candidates = await _existing_digest(dest_file, candidates)
+            if on_disk is not None:
+                by_digest[on_disk] = dest_file
+        for f in candidates:
+            digest = digests[f]
+            if digest in by_digest:
+                logging.info(f"Skipped duplicate (identical content): {f}")
+                continue
+            target = dest_file
+            if by_digest or name_taken:
+                target = dest_file.with_name(f"{f.stem}_{digest[:8]}{f.suffix}")
+            by_digest[digest] = f
+            if link_dupes and digest in placed:
+                links.append((f, placed[digest], target, digest))
+                continue
+            placed[digest] = f
+            plan.append((f, target, digest))
+
+    clash_groups = []
+    for dest_file, members in groups.items():
+        if len(members) == 1 and not link_dupes:
+            plan.append((members[0], dest_file, None))
+        else:
+            clash_groups.append((dest_file, members))
+    await _run_workers(clash_groups, resolve_group)
+    return plan, links
+
+def _iter_files(root: Path, skip: Path) -> Iterator[Path]:
+    """Recursively yield files under *root* via ``os.scandir``, pruning the *skip* subtree."""
+    skip_str = str(skip)
+    stack: List[str] = [str(root)]
+    while stack:
+        path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError as exc:
+            # Unreadable or vanished directory: skip it like rglob does
+            logging.error(f"Error scanning {path}: {exc}")
+            continue
+        with it:
+            for entry in it:
+                # DirEntry caches d_type, so these checks need no extra stat for regular entries
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.path != skip_str:
+                        stack.append(entry.path)
+                elif entry.is_file():
+                    yield Path(entry.path)
+
+async def main_async(src: Path, dst: Path, link_dupes: bool = False) -> None:
     """Main async workflow: gather files and initiate copy tasks."""
     src_path = src.resolve()
     dst_path = dst.resolve()
@@ -112,20 +379,37 @@ async def main_async(src: Path, dst: Path) -> None:
         raise NotADirectoryError(f"{src_path} is not a directory")
     dst_path.mkdir(parents=True, exist_ok=True)
     logging.basicConfig(level=logging.INFO, format="%(message)s")
-    all_files = [p for p in src_path.rglob("*") if p.is_file()]
-    files = [f for f in all_files if dst_path not in f.parents]
+    files = list(_iter_files(src_path, dst_path))
     # Pre-create extension directories
     ext_dirs = { (f.suffix.lower().lstrip(".") or "no_extension") for f in files }
-    for ext in ext_dirs:
-        await aiofiles.os.makedirs(dst_path / ext, exist_ok=True)
-    sem = asyncio.Semaphore(MAX_CONCURRENT)
-    tasks = [asyncio.create_task(copy_file_task(f, dst_path, sem)) for f in files]
-    await asyncio.gather(*tasks)
+    await asyncio.gather(
+        *(aiofiles.os.makedirs(dst_path / ext, exist_ok=True) for ext in ext_dirs)
+    )
+    plan, links = await _plan_copies(files, dst_path, link_dupes)
+    # Where copies landed is only needed for sources that --link-dupes links to
+    link_sources = {orig for _, orig, _, _ in links}
+    copied: Dict[Path, Optional[Path]] = {}
+
+    async def copy_one(f: Path, dest_file: Path, digest: Optional[str]) -> None:
+        landed = await copy_file_task(f, dest_file, digest)
+        if f in link_sources:
+            copied[f] = landed
+
+    async def link_one(f: Path, orig: Path, dest_file: Path, digest: str) -> None:
+        existing = copied.get(orig)
+        if existing is None:
+            await copy_file_task(f, dest_file, digest)
+        else:
+            await link_file_task(f, existing, dest_file, digest)
+
+    await _run_workers(plan, copy_one)
+    # Links go second: their targets must be on disk, wherever collisions put them
+    await _run_workers(links, link_one)
     logging.info("Processing completed.")
 
 def main() -> None:
     args = parse_args()
-    asyncio.run(main_async(args.src, args.dst))
+    asyncio.run(main_async(args.src, args.dst, args.link_dupes))
 
 if __name__ == "__main__":
     main()